@@ -0,0 +1,442 @@
+"""
+A compact columnar binary format for the experiment input file.
+
+The file starts with a magic string, the length of a JSON header and the header
+itself. The header describes a set of NumPy arrays, which are stored one after
+another (each aligned to 64 bytes) in the rest of the file:
+
+- ``strings/offsets`` and ``strings/data``: the interned strings (sample names,
+  string parameters, ...), which are referred to by their index everywhere else
+- ``samples``: the name of each sample
+- ``tasks/type``: the task type of each task, as an index into the header's ``task_types``
+- ``tasks/prev/indptr``, ``tasks/prev/indices``: the ``prev_tasks`` of each task in CSR form
+- ``tasks/samples/indptr``, ``tasks/samples/indices``: the ``samples`` of each task in CSR form
+- ``params/<type>/<key>`` (and ``.../indptr``): one column per parameter of each task type,
+  with one row per task of that type
+
+Without compression, the arrays can be memory-mapped and the tasks are only
+converted to the dict layout of :meth:`Experiment.to_dict` when they are accessed.
+"""
+import json
+import lzma
+import mmap
+import struct
+import zlib
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"ALABCOL1"
+VERSION = 1
+ALIGNMENT = 64
+
+_COMPRESSORS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+_MISSING = object()
+
+
+class ColumnarFormatError(Exception):
+    pass
+
+
+class _StringTable:
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._strings: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, string: str) -> int:
+        idx = self._index.get(string)
+        if idx is None:
+            idx = self._index[string] = len(self._strings)
+            self._strings.append(string.encode("utf-8"))
+        return idx
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        offsets = np.zeros(len(self._strings) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in self._strings], out=offsets[1:])
+        data = np.frombuffer(b"".join(self._strings), dtype=np.uint8)
+        return {"strings/offsets": offsets, "strings/data": data}
+
+
+def _index_array(values: List[int], upper_bound: int) -> np.ndarray:
+    dtype = np.int32 if upper_bound < 2 ** 31 else np.int64
+    return np.array(values, dtype=dtype)
+
+
+def _flatten(lists: List[List[int]]) -> Tuple[np.ndarray, List[int]]:
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=indptr[1:])
+    return indptr, [value for values in lists for value in values]
+
+
+def _column_kind(values: List[Any]) -> str:
+    if any(value is _MISSING for value in values):
+        return "json"
+    if all(type(value) is bool for value in values):
+        return "bool"
+    if all(type(value) is int for value in values):
+        return "int"
+    if all(type(value) is float for value in values):
+        return "float"
+    if all(isinstance(value, str) for value in values):
+        return "str"
+    if all(
+        isinstance(value, list) and all(isinstance(item, str) for item in value)
+        for value in values
+    ):
+        return "str_list"
+    return "json"
+
+
+def dump_columnar(
+    experiment_dict: Dict[str, Any],
+    filename: Union[str, Path],
+    compression: Optional[Literal["zlib", "lzma"]] = None,
+) -> None:
+    """
+    Write an experiment in the columnar binary format.
+
+    Args:
+        experiment_dict: the experiment in the layout of :meth:`Experiment.to_dict`
+        filename: the path of the output file
+        compression: compress each array with ``zlib`` or ``lzma``. Compressed files
+          cannot be memory-mapped.
+    """
+    if compression is not None and compression not in _COMPRESSORS:
+        raise ValueError(f"The compression should be one of {list(_COMPRESSORS)}")
+
+    strings = _StringTable()
+    tasks = experiment_dict["tasks"]
+    arrays: Dict[str, np.ndarray] = {}
+    # arrays of string ids, whose dtype is only known once all strings are interned
+    string_ids: Dict[str, List[int]] = {
+        "samples": [strings.intern(sample["name"]) for sample in experiment_dict["samples"]]
+    }
+
+    task_types: Dict[str, int] = {}
+    type_col = []
+    prev_tasks = []
+    task_samples = []
+    rows_by_type: List[List[Dict[str, Any]]] = []
+    for task in tasks:
+        code = task_types.get(task["type"])
+        if code is None:
+            code = task_types[task["type"]] = len(task_types)
+            rows_by_type.append([])
+        type_col.append(code)
+        rows_by_type[code].append(task["parameters"])
+        prev_tasks.append(task.get("prev_tasks", []))
+        task_samples.append([strings.intern(name) for name in task["samples"]])
+
+    arrays["tasks/type"] = np.array(
+        type_col, dtype=np.min_scalar_type(max(len(task_types) - 1, 0))
+    )
+    arrays["tasks/prev/indptr"], prev_indices = _flatten(prev_tasks)
+    arrays["tasks/prev/indices"] = _index_array(prev_indices, len(tasks))
+    arrays["tasks/samples/indptr"], string_ids["tasks/samples/indices"] = _flatten(task_samples)
+
+    parameters = {}
+    for task_type, code in task_types.items():
+        rows = rows_by_type[code]
+        keys = list(dict.fromkeys(key for row in rows for key in row))
+        columns = {}
+        for i, key in enumerate(keys):
+            name = f"params/{code}/{i}"
+            values = [row.get(key, _MISSING) for row in rows]
+            kind = columns[key] = _column_kind(values)
+            if kind == "bool":
+                arrays[name] = np.array(values, dtype=np.uint8)
+            elif kind == "int":
+                arrays[name] = np.array(values, dtype=np.int64)
+            elif kind == "float":
+                arrays[name] = np.array(values, dtype=np.float64)
+            elif kind == "str":
+                string_ids[name] = [strings.intern(value) for value in values]
+            elif kind == "str_list":
+                arrays[f"{name}/indptr"], string_ids[name] = _flatten(
+                    [[strings.intern(item) for item in value] for value in values]
+                )
+            else:
+                string_ids[name] = [
+                    -1 if value is _MISSING else strings.intern(json.dumps(value))
+                    for value in values
+                ]
+        parameters[task_type] = columns
+
+    for name, values in string_ids.items():
+        arrays[name] = _index_array(values, len(strings))
+    arrays.update(strings.to_arrays())
+
+    compress = _COMPRESSORS[compression][0] if compression is not None else None
+    array_specs = {}
+    payloads = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        payload = array.tobytes()
+        if compress is not None:
+            payload = compress(payload)
+        offset += -offset % ALIGNMENT
+        array_specs[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": len(payload),
+        }
+        payloads.append((offset, payload))
+        offset += len(payload)
+
+    header = json.dumps(
+        {
+            "version": VERSION,
+            "name": experiment_dict["name"],
+            "compression": compression,
+            "task_types": list(task_types),
+            "parameters": parameters,
+            "arrays": array_specs,
+        }
+    ).encode("utf-8")
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += -data_start % ALIGNMENT
+
+    with Path(filename).open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_start - f.tell()))
+        for offset, payload in payloads:
+            f.write(b"\0" * (data_start + offset - f.tell()))
+            f.write(payload)
+
+
+class ColumnarInputFile:
+    """
+    Reader for the columnar binary format. The arrays are memory-mapped (or
+    decompressed) when they are first accessed, and tasks are converted to the
+    dict layout of :meth:`Experiment.to_dict` on demand.
+    """
+
+    def __init__(self, filename: Union[str, Path], use_mmap: bool = True):
+        self._file = Path(filename).open("rb")
+        self._buffer = None
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ColumnarFormatError(f"{filename} is not a columnar input file")
+            self._file.seek(0)
+            if use_mmap:
+                self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = self._file.read()
+
+            (header_len,) = struct.unpack_from("<Q", self._buffer, len(MAGIC))
+            header_start = len(MAGIC) + 8
+            header = json.loads(bytes(self._buffer[header_start:header_start + header_len]))
+            if header.get("version") != VERSION:
+                raise ColumnarFormatError(
+                    f"{filename} has version {header.get('version')} of the columnar format, "
+                    f"only version {VERSION} is supported"
+                )
+            data_start = header_start + header_len
+            self._data_start = data_start + -data_start % ALIGNMENT
+
+            self.name: str = header["name"]
+            self.compression: Optional[str] = header["compression"]
+            self.task_types: List[str] = header["task_types"]
+            self._parameters: Dict[str, Dict[str, str]] = header["parameters"]
+            self._array_specs: Dict[str, Dict[str, Any]] = header["arrays"]
+        except Exception as e:
+            if isinstance(self._buffer, mmap.mmap):
+                self._buffer.close()
+            self._file.close()
+            if isinstance(e, ColumnarFormatError):
+                raise
+            raise ColumnarFormatError(f"{filename} has an invalid header") from e
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._columns: Dict[int, List[Any]] = {}
+
+    def __enter__(self) -> "ColumnarInputFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # drop the views into the buffer before closing the mmap
+        self._arrays.clear()
+        self.__dict__.pop("type_codes", None)
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                # arrays returned by ``array`` are still in use, the mapping
+                # is released once they are garbage-collected
+                pass
+        self._file.close()
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Get one of the stored arrays. Without compression, the array is a read-only
+        view into the memory-mapped file.
+        """
+        if name not in self._arrays:
+            spec = self._array_specs[name]
+            dtype = np.dtype(spec["dtype"])
+            start = self._data_start + spec["offset"]
+            if self.compression is None:
+                count = int(np.prod(spec["shape"], dtype=np.int64))
+                array = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=start)
+            else:
+                decompress = _COMPRESSORS[self.compression][1]
+                array = np.frombuffer(
+                    decompress(self._buffer[start:start + spec["nbytes"]]), dtype=dtype
+                )
+            self._arrays[name] = array.reshape(spec["shape"])
+        return self._arrays[name]
+
+    @cached_property
+    def strings(self) -> List[str]:
+        offsets = self.array("strings/offsets").tolist()
+        data = self.array("strings/data").tobytes()
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    @property
+    def num_tasks(self) -> int:
+        return self._array_specs["tasks/type"]["shape"][0]
+
+    @property
+    def num_samples(self) -> int:
+        return self._array_specs["samples"]["shape"][0]
+
+    @cached_property
+    def type_codes(self) -> np.ndarray:
+        return self.array("tasks/type")
+
+    @cached_property
+    def _type_rows(self) -> List[int]:
+        """
+        The row of each task in the parameter columns of its task type.
+        """
+        codes = self.type_codes.astype(np.int64)
+        order = np.argsort(codes, kind="stable")
+        group_starts = np.searchsorted(codes[order], np.arange(len(self.task_types)))
+        rows = np.empty(len(codes), dtype=np.int64)
+        rows[order] = np.arange(len(codes)) - group_starts[codes[order]]
+        return rows.tolist()
+
+    def _column(self, code: int, index: int, kind: str) -> Any:
+        prefix = f"params/{code}/{index}"
+        if kind in ("bool", "int", "float"):
+            values = self.array(prefix).tolist()
+            return [bool(v) for v in values] if kind == "bool" else values
+        strings = self.strings
+        if kind == "str":
+            return [strings[i] for i in self.array(prefix).tolist()]
+        if kind == "str_list":
+            return (self.array(f"{prefix}/indptr").tolist(), self.array(prefix).tolist())
+        return self.array(prefix).tolist()
+
+    def _columns_of(self, code: int) -> List[Any]:
+        if code not in self._columns:
+            columns = self._parameters[self.task_types[code]]
+            self._columns[code] = [
+                (key, kind, self._column(code, i, kind))
+                for i, (key, kind) in enumerate(columns.items())
+            ]
+        return self._columns[code]
+
+    def _task_parameters(self, code: int, row: int) -> Dict[str, Any]:
+        parameters = {}
+        strings = self.strings
+        for key, kind, column in self._columns_of(code):
+            if kind == "str_list":
+                indptr, indices = column
+                parameters[key] = [strings[i] for i in indices[indptr[row]:indptr[row + 1]]]
+            elif kind == "json":
+                if column[row] >= 0:
+                    parameters[key] = json.loads(strings[column[row]])
+            else:
+                parameters[key] = column[row]
+        return parameters
+
+    @cached_property
+    def _task_csrs(self):
+        return (
+            self.array("tasks/prev/indptr").tolist(),
+            self.array("tasks/prev/indices").tolist(),
+            self.array("tasks/samples/indptr").tolist(),
+            self.array("tasks/samples/indices").tolist(),
+        )
+
+    def task(self, i: int) -> Dict[str, Any]:
+        """
+        Get the i-th task in the dict layout of :meth:`Experiment.to_dict`.
+        """
+        code = int(self.type_codes[i])
+        prev_indptr, prev_indices, samples_indptr, samples_indices = self._task_csrs
+        strings = self.strings
+        return {
+            "type": self.task_types[code],
+            "parameters": self._task_parameters(code, self._type_rows[i]),
+            "samples": [strings[j] for j in samples_indices[samples_indptr[i]:samples_indptr[i + 1]]],
+            "prev_tasks": prev_indices[prev_indptr[i]:prev_indptr[i + 1]],
+        }
+
+    def samples(self) -> List[Dict[str, str]]:
+        strings = self.strings
+        return [{"name": strings[i]} for i in self.array("samples").tolist()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "samples": self.samples(),
+            "tasks": [self.task(i) for i in range(self.num_tasks)],
+        }
+
+    def to_task_graph(self):
+        """
+        Build the :class:`~alab_experiment_helper.graph.TaskGraph` directly from the
+        stored ``prev_tasks`` CSR arrays.
+        """
+        from .graph import TaskGraph, estimate_task_duration
+
+        code_list = self.type_codes.tolist()
+        type_rows = self._type_rows
+        durations = np.fromiter(
+            (
+                estimate_task_duration(
+                    self.task_types[code], self._task_parameters(code, type_rows[i])
+                )
+                for i, code in enumerate(code_list)
+            ),
+            dtype=np.float64,
+            count=len(code_list),
+        )
+        return TaskGraph(
+            task_ids=[str(i) for i in range(self.num_tasks)],
+            task_types=[self.task_types[code] for code in code_list],
+            indptr=self.array("tasks/prev/indptr").copy(),
+            indices=self.array("tasks/prev/indices").copy(),
+            durations=durations,
+        )
+
+
+def load_columnar(filename: Union[str, Path], use_mmap: bool = True) -> ColumnarInputFile:
+    """
+    Open a file written by :func:`dump_columnar`.
+
+    Args:
+        filename: the path of the file
+        use_mmap: memory-map the file instead of reading it into memory
+
+    Returns:
+        the reader, which can be converted with :meth:`ColumnarInputFile.to_dict`
+    """
+    return ColumnarInputFile(filename, use_mmap=use_mmap)
@@ -1,19 +1,167 @@
+import copy
 from pathlib import Path
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional, Sequence, Set, Tuple
 
 from .sample import Sample
+from .template import TemplateInstance, WorkflowTemplate
+
+# the containers that are shared between forks and copied before they are modified
+_COPY_ON_WRITE = (
+    "_sample_names",
+    "_sample_tasks",
+    "_sample_index",
+    "_tasks",
+    "_template_instances",
+    "_template_sample_index",
+)
 
 
 class Experiment:
     def __init__(self, name: str):
         self.name = name
-        self._samples: List[Sample] = []
+        self._sample_names: List[str] = []
+        # the task ids of each sample, stored as tuples so that they can be shared between forks
+        self._sample_tasks: List[Tuple[str, ...]] = []
+        self._sample_index: Dict[str, int] = {}
         self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._template_instances: List[TemplateInstance] = []
+        # the (instance, row) of each sample that is added from a template
+        self._template_sample_index: Dict[str, Tuple[int, int]] = {}
+        self._shared: Set[str] = set()
+        # the template instances that were copied by this experiment after a fork
+        self._owned_template_instances: Set[int] = set()
+
+    def _own(self, attr: str):
+        """
+        Get a container for modification, copying it first if it is shared with a fork.
+        """
+        if attr in self._shared:
+            setattr(self, attr, copy.copy(getattr(self, attr)))
+            self._shared.discard(attr)
+        return getattr(self, attr)
+
+    def fork(self, name: Optional[str] = None) -> "Experiment":
+        """
+        Create a copy of the experiment that can be modified independently, e.g. to
+        build variants of a base experiment. The samples, tasks and parameters are
+        shared between the forks and only copied when one of them modifies them.
+
+        Args:
+            name: the name of the new experiment. By default, the name is kept.
+        """
+        fork = Experiment(self.name if name is None else name)
+        for attr in _COPY_ON_WRITE:
+            setattr(fork, attr, getattr(self, attr))
+        fork._shared = set(_COPY_ON_WRITE)
+        self._shared = set(_COPY_ON_WRITE)
+        self._owned_template_instances = set()
+        return fork
+
+    def _check_sample_name(self, name: str) -> None:
+        if name in self._sample_index or name in self._template_sample_index:
+            raise ValueError(f"A sample named {name} already exists in experiment {self.name}")
 
     def add_sample(self, name: str) -> Sample:
-        sample = Sample(name, experiment=self)
-        self._samples.append(sample)
-        return sample
+        self._check_sample_name(name)
+        index = len(self._sample_names)
+        self._own("_sample_names").append(name)
+        self._own("_sample_tasks").append(())
+        self._own("_sample_index")[name] = index
+        return Sample(name, experiment=self)
+
+    def add_samples_from_template(
+        self,
+        template: WorkflowTemplate,
+        sample_names: Sequence[str],
+        parameters: Optional[Dict[str, Sequence[Any]]] = None,
+    ) -> TemplateInstance:
+        """
+        Add samples that all go through the chain of tasks in ``template``. The tasks
+        are only expanded when the experiment is exported, after the other samples.
+        Steps can group consecutive samples into batches, see :class:`WorkflowTemplate`.
+        The sample names must not be used by any other sample of the experiment.
+
+        Args:
+            template: the workflow template
+            sample_names: the names of the samples
+            parameters: the per-sample parameter table, as a dict of columns with one value per sample
+        """
+        for name in sample_names:
+            self._check_sample_name(name)
+        position = len(self._template_instances)
+        instance = TemplateInstance(
+            template, sample_names, parameters, experiment=self, key=f"{template.name}#{position}"
+        )
+        self._own("_template_instances").append(instance)
+        template_sample_index = self._own("_template_sample_index")
+        for row, name in enumerate(instance.sample_names):
+            template_sample_index[name] = (position, row)
+        return instance
+
+    @property
+    def template_instances(self) -> List[TemplateInstance]:
+        return self._template_instances
+
+    def sample(self, name: str) -> Sample:
+        """
+        Get the sample with the given name, e.g. to add tasks to it in a fork.
+        """
+        self._sample_position(name)
+        return Sample(name, experiment=self)
+
+    @property
+    def samples(self) -> List[Sample]:
+        """
+        All the samples, including the ones added from templates.
+        """
+        return self.eager_samples + [
+            Sample(name, experiment=self)
+            for instance in self._template_instances
+            for name in instance.sample_names
+        ]
+
+    @property
+    def eager_samples(self) -> List[Sample]:
+        """
+        The samples whose tasks were added with the task functions.
+        """
+        return [Sample(name, experiment=self) for name in self._sample_names]
+
+    def _sample_position(self, name: str) -> int:
+        if name not in self._sample_index and name not in self._template_sample_index:
+            raise KeyError(f"No sample named {name} in experiment {self.name}")
+        return self._sample_index.get(name, -1)
+
+    def sample_tasks(self, name: str) -> Tuple[str, ...]:
+        index = self._sample_position(name)
+        if index < 0:
+            position, row = self._template_sample_index[name]
+            return self._template_instances[position].sample_task_ids(row)
+        return self._sample_tasks[index]
+
+    def check_task_samples(self, samples: List[Sample]) -> None:
+        """
+        Check that tasks can be added to the samples, before anything is changed.
+        The samples must be in the experiment and not be added from a template.
+        """
+        for sample in samples:
+            if self._sample_position(sample.name) < 0:
+                raise ValueError(
+                    f"Sample {sample.name} is added from a template, its tasks cannot be extended"
+                )
+
+    def add_sample_task(self, name: str, task_id: str) -> None:
+        index = self._sample_position(name)
+        if index < 0:
+            raise ValueError(
+                f"Sample {name} is added from a template, its tasks cannot be extended"
+            )
+        sample_tasks = self._own("_sample_tasks")
+        sample_tasks[index] = sample_tasks[index] + (task_id,)
+
+    @property
+    def tasks(self) -> Dict[str, Dict[str, Any]]:
+        return self._tasks
 
     def add_task(
         self,
@@ -24,34 +172,109 @@ class Experiment:
     ) -> None:
         if task_id in self._tasks:
             return
-        self._tasks[task_id] = {
+        self._own("_tasks")[task_id] = {
             "type": task_name,
             "parameters": task_params,
             "samples": [sample.name for sample in samples],
         }
 
+    def find_tasks(
+        self, task_type: Optional[str] = None, sample_name: Optional[str] = None
+    ) -> List[str]:
+        """
+        Find the ids of the tasks with the given type and/or on the given sample.
+        """
+        if sample_name is not None:
+            task_ids = self.sample_tasks(sample_name)
+        else:
+            task_ids = list(self._tasks)
+            for instance in self._template_instances:
+                # the samples of a batch share their task ids
+                task_ids.extend(dict.fromkeys(
+                    task_id for row in range(len(instance)) for task_id in instance.sample_task_ids(row)
+                ))
+        return [
+            task_id
+            for task_id in task_ids
+            if task_type is None or self.task_type(task_id) == task_type
+        ]
+
+    def _template_task(self, task_id: str) -> Tuple[int, int, int]:
+        """
+        Get the (instance, row, step) of a task that is expanded from a template.
+        """
+        parts = task_id.rsplit("/", 2)
+        position = parts[0].rpartition("#")[2]
+        if len(parts) == 3 and position.isdigit() and parts[1].isdigit() and parts[2].isdigit():
+            position, row, step = int(position), int(parts[1]), int(parts[2])
+            if position < len(self._template_instances):
+                instance = self._template_instances[position]
+                if (
+                    instance.key == parts[0]
+                    and step < len(instance.steps)
+                    and row < len(instance)
+                    and row == instance.batch(row, step).start
+                ):
+                    return position, row, step
+        raise KeyError(f"No task with id {task_id} in experiment {self.name}")
+
+    def task(self, task_id: str) -> Dict[str, Any]:
+        """
+        Get a task, expanding it if it belongs to samples added from a template.
+        """
+        if task_id in self._tasks:
+            return self._tasks[task_id]
+        position, row, step = self._template_task(task_id)
+        return self._template_instances[position].task(row, step)
+
+    def task_type(self, task_id: str) -> str:
+        if task_id in self._tasks:
+            return self._tasks[task_id]["type"]
+        position, _, step = self._template_task(task_id)
+        return self._template_instances[position].steps[step].task_name
+
+    def update_task(self, task_id: str, **task_params: Any) -> None:
+        """
+        Change some parameters of a task, e.g. the atmosphere of a heating task in
+        a fork. The parameters are stored as given, without being validated again.
+        Tasks of samples added from a template are overridden in a copy of the
+        template instance, which is shared with the forks until then.
+        """
+        if task_id not in self._tasks:
+            position, row, step = self._template_task(task_id)
+            instances = self._own("_template_instances")
+            if position in self._owned_template_instances:
+                overrides = instances[position].overrides
+                overrides[row, step] = {**overrides.get((row, step), {}), **task_params}
+            else:
+                instances[position] = instances[position].with_override(row, step, task_params)
+                self._owned_template_instances.add(position)
+            return
+
+        task = self._tasks[task_id]
+        self._own("_tasks")[task_id] = {
+            **task,
+            "parameters": {**task["parameters"], **task_params},
+        }
+
     def to_dict(self):
         samples = []
         tasks = []
         task_ids = {}
 
-        for sample in self._samples:
+        for sample in self.samples:
             samples.append(sample.to_dict())
             last_task_id = None
             for task_id in sample.tasks:
-                task = self._tasks[task_id]
                 if task_id not in task_ids:
                     task_ids[task_id] = len(tasks)
-                    # task["next_tasks"] = set()
-                    task["prev_tasks"] = set()
-                    tasks.append(task)
+                    # the stored task may be shared with forks, so it is not modified
+                    tasks.append({**self.task(task_id), "prev_tasks": set()})
                 if last_task_id is not None:
-                    # tasks[task_ids[last_task_id]]["next_tasks"].add(task_ids[task_id])
-                    task["prev_tasks"].add(task_ids[last_task_id])
+                    tasks[task_ids[task_id]]["prev_tasks"].add(task_ids[last_task_id])
                 last_task_id = task_id
 
         for task in tasks:
-            # task["next_tasks"] = list(task["next_tasks"])
             task["prev_tasks"] = list(task["prev_tasks"])
 
         return {
@@ -60,9 +283,38 @@ class Experiment:
             "tasks": tasks,
         }
 
+    def to_task_graph(self):
+        """
+        Export the task graph as compressed-sparse-row NumPy arrays, with the tasks
+        numbered in the same order as ``to_dict``. See :class:`~alab_experiment_helper.graph.TaskGraph`.
+        """
+        from .graph import TaskGraph
+
+        return TaskGraph.from_experiment(self)
+
     def generate_input_file(
-        self, filename: str, fmt: Literal["json", "yaml"] = "json"
+        self,
+        filename: str,
+        fmt: Literal["json", "yaml", "columnar"] = "json",
+        compression: Optional[Literal["zlib", "lzma"]] = None,
     ) -> None:
+        """
+        Write the input file of the experiment.
+
+        Args:
+            filename: the path of the output file
+            fmt: the format of the file
+            compression: the compression of the ``columnar`` format, see
+              :func:`~alab_experiment_helper.columnar.dump_columnar`
+        """
+        if fmt == "columnar":
+            from .columnar import dump_columnar
+
+            dump_columnar(self.to_dict(), filename, compression=compression)
+            return
+        if compression is not None:
+            raise ValueError("Compression is only supported for the columnar format")
+
         with Path(filename).open("w", encoding="utf-8") as f:
             if fmt == "json":
                 import json
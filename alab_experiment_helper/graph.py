@@ -0,0 +1,246 @@
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIFFRACTION_SCHEMA_MINUTES = {
+    "fast_10min": 10.0,
+    "slow_30min": 30.0,
+}
+
+
+class CycleError(Exception):
+    pass
+
+
+def _heating_minutes(task_params: Dict[str, Any]) -> float:
+    # setpoints are stored as [temperature, duration (minutes)] pairs
+    if "setpoints" in task_params:
+        return float(sum(setpoint[1] for setpoint in task_params["setpoints"]))
+    return float(task_params["heating_time"])
+
+
+def _diffraction_minutes(task_params: Dict[str, Any]) -> float:
+    return DIFFRACTION_SCHEMA_MINUTES[task_params.get("schema", "fast_10min")]
+
+
+def _recover_powder_minutes(task_params: Dict[str, Any]) -> float:
+    return (
+        task_params.get("crucible_shake_duration_seconds", 0)
+        + task_params.get("vial_shake_duration_seconds", 0)
+    ) / 60.0
+
+
+TASK_DURATION_ESTIMATORS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "Heating": _heating_minutes,
+    "HeatingWithAtmosphere": _heating_minutes,
+    "Diffraction": _diffraction_minutes,
+    "RecoverPowder": _recover_powder_minutes,
+}
+
+
+def estimate_task_duration(task_type: str, task_params: Dict[str, Any]) -> float:
+    """
+    Estimate the duration (minutes) of a task from its parameters. Task types
+    without an entry in ``TASK_DURATION_ESTIMATORS`` are assumed to take no time.
+
+    Args:
+        task_type: the type of the task, e.g. ``Heating``
+        task_params: the parameters of the task
+
+    Returns:
+        the estimated duration in minutes
+    """
+    estimator = TASK_DURATION_ESTIMATORS.get(task_type)
+    if estimator is None:
+        return 0.0
+    return estimator(task_params)
+
+
+def _gather(
+    indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the neighbours of ``nodes`` from a CSR structure. Returns the
+    (node, neighbour) pairs as two aligned arrays.
+    """
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(nodes, counts), indices[offsets]
+
+
+class TaskGraph:
+    """
+    The task graph of an experiment in compressed-sparse-row (CSR) form. The
+    tasks are numbered in the same order as ``Experiment.to_dict()["tasks"]``,
+    and the predecessors of task ``i`` are ``indices[indptr[i]:indptr[i + 1]]``,
+    i.e. the same information as its ``prev_tasks``.
+    """
+
+    def __init__(
+        self,
+        task_ids: List[str],
+        task_types: List[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        durations: Optional[np.ndarray] = None,
+    ):
+        self.task_ids = task_ids
+        self.task_types = task_types
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        if durations is None:
+            durations = np.zeros(len(task_ids), dtype=np.float64)
+        self.durations = np.asarray(durations, dtype=np.float64)
+
+    @classmethod
+    def from_edges(
+        cls,
+        task_ids: List[str],
+        task_types: List[str],
+        src: Sequence[int],
+        dst: Sequence[int],
+        durations: Optional[np.ndarray] = None,
+    ) -> "TaskGraph":
+        """
+        Build the graph from a list of ``src -> dst`` edges. Duplicated edges are removed.
+        """
+        n = len(task_ids)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if src.size:
+            keys = np.unique(dst * n + src)
+            dst, src = np.divmod(keys, n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=indptr[1:])
+        return cls(task_ids, task_types, indptr, src, durations)
+
+    @classmethod
+    def from_experiment(cls, experiment) -> "TaskGraph":
+        task_index: Dict[str, int] = {}
+        task_ids = []
+        task_types = []
+        durations = []
+        src = []
+        dst = []
+        for sample in experiment.samples:
+            last = -1
+            for task_id in sample.tasks:
+                idx = task_index.get(task_id)
+                if idx is None:
+                    idx = task_index[task_id] = len(task_ids)
+                    task = experiment.task(task_id)
+                    task_ids.append(task_id)
+                    task_types.append(task["type"])
+                    durations.append(estimate_task_duration(task["type"], task["parameters"]))
+                if last >= 0:
+                    src.append(last)
+                    dst.append(idx)
+                last = idx
+
+        return cls.from_edges(
+            task_ids, task_types, src, dst, np.array(durations, dtype=np.float64)
+        )
+
+    @property
+    def num_tasks(self) -> int:
+        return len(self.task_ids)
+
+    def prev_tasks(self, task: int) -> np.ndarray:
+        return self.indices[self.indptr[task]:self.indptr[task + 1]]
+
+    @cached_property
+    def successors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The transposed graph as ``(indptr, indices)``, i.e. the next tasks of each task.
+        """
+        n = self.num_tasks
+        dst = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n), out=indptr[1:])
+        return indptr, dst[order]
+
+    @cached_property
+    def levels(self) -> np.ndarray:
+        """
+        The depth of each task, i.e. the length of the longest chain of tasks
+        before it. Tasks that are part of (or come after) a cycle get ``-1``.
+        """
+        n = self.num_tasks
+        succ_indptr, succ_indices = self.successors
+        indegree = np.diff(self.indptr)
+        levels = np.full(n, -1, dtype=np.int64)
+        frontier = np.flatnonzero(indegree == 0)
+        depth = 0
+        while frontier.size:
+            levels[frontier] = depth
+            _, targets = _gather(succ_indptr, succ_indices, frontier)
+            targets, counts = np.unique(targets, return_counts=True)
+            indegree[targets] -= counts
+            frontier = targets[indegree[targets] == 0]
+            depth += 1
+        return levels
+
+    def has_cycle(self) -> bool:
+        return bool((self.levels < 0).any())
+
+    def cycle_tasks(self) -> np.ndarray:
+        """
+        The indices of the tasks that are part of a cycle or depend on one.
+        """
+        return np.flatnonzero(self.levels < 0)
+
+    def topological_order(self) -> np.ndarray:
+        """
+        A topological order of the tasks, sorted by level and then by index.
+        """
+        if self.has_cycle():
+            raise CycleError(
+                f"The task graph contains a cycle involving tasks {self.cycle_tasks().tolist()}"
+            )
+        return np.argsort(self.levels, kind="stable")
+
+    def critical_path(
+        self, durations: Optional[np.ndarray] = None
+    ) -> Tuple[float, np.ndarray]:
+        """
+        Find the longest chain of tasks, weighted by the task durations.
+
+        Args:
+            durations: the duration of each task in minutes. By default, the
+              durations estimated from the task parameters are used.
+
+        Returns:
+            the total duration of the critical path and the indices of the tasks on it
+        """
+        if durations is None:
+            durations = self.durations
+        durations = np.asarray(durations, dtype=np.float64)
+        n = self.num_tasks
+        if n == 0:
+            return 0.0, np.empty(0, dtype=np.int64)
+
+        order = self.topological_order()
+        boundaries = np.flatnonzero(np.diff(self.levels[order])) + 1
+        succ_indptr, succ_indices = self.successors
+        start = np.zeros(n, dtype=np.float64)
+        finish = np.zeros(n, dtype=np.float64)
+        for group in np.split(order, boundaries):
+            finish[group] = start[group] + durations[group]
+            src, dst = _gather(succ_indptr, succ_indices, group)
+            np.maximum.at(start, dst, finish[src])
+
+        # among the tasks finishing last, end the path at the deepest one
+        task = int(np.lexsort((self.levels, finish))[-1])
+        path = [task]
+        while self.indptr[task + 1] > self.indptr[task]:
+            prev_tasks = self.prev_tasks(task)
+            task = int(prev_tasks[np.argmax(finish[prev_tasks])])
+            path.append(task)
+        return float(finish[path[0]]), np.array(path[::-1], dtype=np.int64)
@@ -1,10 +1,12 @@
+import copy
 from functools import lru_cache
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 
 from material_parser import MaterialParser
 from reaction_completer import balance_recipe
 from reaction_completer.periodic_table import PT
 
+from alab_experiment_helper.reactions.linear_balance import balance_linear
 from alab_experiment_helper.reactions.recipe import Recipe
 
 mp = MaterialParser()
@@ -23,6 +25,7 @@ def generate_recipe(
         precursor_list: List[str],
         target_mass_g: Optional[float] = None,
         target_mol: Optional[float] = None,
+        backend: Literal["auto", "linear", "reaction_completer"] = "reaction_completer",
 ) -> Recipe:
     """
     Generate a recipe for the target material.
@@ -32,30 +35,79 @@ def generate_recipe(
         precursor_list: the list of precursor materials
         target_mass_g: the target mass in g
         target_mol: the target mol amount
+        backend: the backend to balance the reaction with. ``linear`` solves the
+          element-composition matrix directly, ``reaction_completer`` uses
+          ``balance_recipe`` (the default). ``auto`` tries ``linear`` first and uses
+          ``balance_recipe`` if the reaction cannot be solved uniquely.
 
     Returns:
-        the recipe for the target material
+        the recipe for the target material. Precursors that the balanced reaction
+        does not consume are left out, with either backend.
     """
-    target = parse_material_string(target)
-    precursors = [parse_material_string(precursor) for precursor in precursor_list]
-
     if target_mass_g is not None and target_mol is not None:
         raise ValueError("Cannot specify both target mass and target mol")
-    elif target_mass_g is not None:
-        target_mol = target_mass_g / target["molmass"]
-    elif target_mol is not None:
-        pass
-    else:
+    elif target_mass_g is None and target_mol is None:
         raise ValueError("No target mol amount or mass was given!")
 
-    balanced_reaction = balance_recipe(precursors, [target])
-    if not balanced_reaction:
-        raise BalanceError("Could not balance reaction")
-    balanced_reaction = balanced_reaction[0][1]
-    recipe = Recipe.build_recipe(balanced_reaction, precursors, target)
+    # the cache key does not depend on the order of the precursors
+    cached_recipe = balance_reaction(target, tuple(sorted(precursor_list)), backend)
+    precursor_order = {
+        parse_material_string(precursor)["material_formula"]: i
+        for i, precursor in enumerate(precursor_list)
+    }
+    # the cached recipe is shared, so the caller gets its own balanced reaction
+    balanced_reaction = copy.deepcopy(cached_recipe.balanced_reaction)
+    balanced_reaction["left"] = dict(sorted(
+        balanced_reaction["left"].items(),
+        key=lambda item: precursor_order.get(item[0], len(precursor_order)),
+    ))
+    recipe = Recipe(
+        precursors=sorted(cached_recipe.precursors, key=lambda p: precursor_order[p.formula]),
+        target=cached_recipe.target,
+        balanced_reaction=balanced_reaction,
+    )
+    if target_mass_g is not None:
+        target_mol = target_mass_g / recipe.target.molmass
     return recipe * (target_mol / recipe.target.mol)
 
 
+@lru_cache(maxsize=1024)
+def balance_reaction(
+        target: str,
+        precursors: Tuple[str, ...],
+        backend: Literal["auto", "linear", "reaction_completer"] = "reaction_completer",
+) -> Recipe:
+    """
+    Balance the reaction from the precursors to the target. The result is cached,
+    so that recipes with the same target and precursors (e.g. in a parameter sweep)
+    are only balanced once.
+
+    Args:
+        target: the target material
+        precursors: the precursor materials
+        backend: the backend to balance the reaction with, see ``generate_recipe``
+
+    Returns:
+        the recipe of the balanced reaction, not scaled to any amount
+    """
+    if backend not in ("auto", "linear", "reaction_completer"):
+        raise ValueError(f"Unknown backend {backend}")
+    target = parse_material_string(target)
+    precursors = [parse_material_string(precursor) for precursor in precursors]
+
+    balanced_reaction = None
+    if backend != "reaction_completer":
+        balanced_reaction = balance_linear(precursors, target)
+        if balanced_reaction is None and backend == "linear":
+            raise BalanceError("Could not balance reaction uniquely with the linear backend")
+    if balanced_reaction is None:
+        balanced_reaction = balance_recipe(precursors, [target])
+        if not balanced_reaction:
+            raise BalanceError("Could not balance reaction")
+        balanced_reaction = balanced_reaction[0][1]
+    return Recipe.build_recipe(balanced_reaction, precursors, target)
+
+
 @lru_cache(maxsize=1024)
 def parse_material_string(material_string: str) -> dict:
     material_dict = mp.parse_material_string(material_string)
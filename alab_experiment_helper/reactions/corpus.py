@@ -0,0 +1,19 @@
+# real targets and their precursors, used to cross-check and benchmark the
+# balancing backends against reaction_completer
+CORPUS = [
+    ("BaTiO3", ["BaCO3", "TiO2"]),
+    ("SrTiO3", ["SrCO3", "TiO2"]),
+    ("LiCoO2", ["Li2CO3", "Co3O4"]),
+    ("LiMn2O4", ["Li2CO3", "MnO2"]),
+    ("Li4Ti5O12", ["Li2CO3", "TiO2"]),
+    ("LiFePO4", ["Li2CO3", "Fe2O3", "NH4H2PO4"]),
+    ("NaFePO4", ["Na2CO3", "Fe2O3", "NH4H2PO4"]),
+    ("Na3V2(PO4)3", ["Na2CO3", "V2O5", "NH4H2PO4"]),
+    ("LiNi0.8Co0.1Mn0.1O2", ["LiOH", "NiO", "Co3O4", "MnO2"]),
+    ("Ca3(PO4)2", ["CaCO3", "NH4H2PO4"]),
+    ("Y3Al5O12", ["Y2O3", "Al2O3"]),
+    ("Li7La3Zr2O12", ["Li2CO3", "La2O3", "ZrO2"]),
+    ("KNbO3", ["K2CO3", "Nb2O5"]),
+    ("MgAl2O4", ["MgO", "Al2O3"]),
+    ("Na1.25Zr0.5Ge0.5Mg0.5Nb0.5(PO4)3", ["Na2CO3", "NH4H2PO4", "ZrO2", "SiO2", "GeO2", "MgO", "Nb2O5"]),
+]
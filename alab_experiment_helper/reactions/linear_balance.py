@@ -0,0 +1,115 @@
+from fractions import Fraction
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# the gas that carries away an element that is in the precursors but not in the target
+RELEASED_GASES = {
+    "C": ("CO2", {"C": Fraction(1), "O": Fraction(2)}),
+    "H": ("H2O", {"H": Fraction(2), "O": Fraction(1)}),
+    "N": ("NH3", {"N": Fraction(1), "H": Fraction(3)}),
+}
+OXYGEN = ("O2", {"O": Fraction(2)})
+
+
+def material_composition(material_dict: dict) -> Optional[Dict[str, Fraction]]:
+    """
+    Get the exact element amounts of a parsed material.
+
+    Args:
+        material_dict: the material parsed by ``parse_material_string``
+
+    Returns:
+        the amount of each element, or None if the composition has open variables
+    """
+    composition: Dict[str, Fraction] = {}
+    for comp in material_dict["composition"]:
+        try:
+            comp_amount = Fraction(str(comp["amount"]))
+            for element, amount in comp["elements"].items():
+                composition[element] = (
+                    composition.get(element, Fraction(0)) + comp_amount * Fraction(str(amount))
+                )
+        except (ValueError, ZeroDivisionError):
+            return None
+    return composition
+
+
+def balance_linear(
+    precursor_dict_list: List[dict],
+    target_dict: dict,
+    max_denominator: int = 10 ** 6,
+) -> Optional[Dict[str, Dict[str, float]]]:
+    """
+    Balance the reaction from the precursors to one mol of the target by solving
+    the element-composition matrix. Elements that are only in the precursors are
+    released as CO2, H2O or NH3 and O2 can be released or absorbed. The solution
+    is verified with exact rational arithmetic.
+
+    Args:
+        precursor_dict_list: the precursors parsed by ``parse_material_string``
+        target_dict: the target parsed by ``parse_material_string``
+        max_denominator: the largest denominator of the rational coefficients
+
+    Returns:
+        the balanced reaction in the same layout as ``reaction_completer``, or None if
+        the reaction has no unique solution with non-negative amounts
+    """
+    target = material_composition(target_dict)
+    precursors = [material_composition(precursor) for precursor in precursor_dict_list]
+    if target is None or any(precursor is None for precursor in precursors):
+        return None
+
+    formulas = [precursor["material_formula"] for precursor in precursor_dict_list]
+    target_formula = target_dict["material_formula"]
+    if len(set(formulas)) != len(formulas) or target_formula in formulas:
+        return None
+
+    precursor_elements = set().union(*precursors)
+    released = [
+        gas for element, gas in RELEASED_GASES.items()
+        if element in precursor_elements and element not in target
+    ]
+    # precursors are consumed, the gases are released and O2 may go either way
+    species = [(composition, 1) for composition in precursors]
+    species += [(composition, -1) for _, composition in released]
+    species.append((OXYGEN[1], -1))
+    elements = sorted(precursor_elements | set(target) | {"O"})
+
+    matrix = np.array(
+        [[sign * float(composition.get(element, 0)) for composition, sign in species] for element in elements]
+    )
+    rhs = np.array([float(target.get(element, 0)) for element in elements])
+    if np.linalg.matrix_rank(matrix) < len(species):
+        return None
+    solution = np.linalg.lstsq(matrix, rhs, rcond=None)[0]
+    coefficients = [Fraction(float(x)).limit_denominator(max_denominator) for x in solution]
+
+    for element in elements:
+        total = sum(
+            sign * coefficient * composition.get(element, 0)
+            for (composition, sign), coefficient in zip(species, coefficients)
+        )
+        if total != target.get(element, 0):
+            return None
+
+    precursor_amounts = coefficients[:len(precursors)]
+    gas_amounts = coefficients[len(precursors):-1]
+    oxygen_amount = coefficients[-1]
+    if any(amount < 0 for amount in precursor_amounts + gas_amounts):
+        return None
+
+    left = {
+        formula: float(amount)
+        for formula, amount in zip(formulas, precursor_amounts)
+        if amount != 0
+    }
+    right = {target_formula: 1.0}
+    for (gas, _), amount in zip(released, gas_amounts):
+        if amount != 0:
+            right[gas] = float(amount)
+    if oxygen_amount > 0:
+        right[OXYGEN[0]] = float(oxygen_amount)
+    elif oxygen_amount < 0:
+        left[OXYGEN[0]] = float(-oxygen_amount)
+    return {"left": left, "right": right}
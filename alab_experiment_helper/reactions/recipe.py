@@ -60,6 +60,11 @@ class Recipe(pydantic.BaseModel):
             precursor_dict_list: List[Dict],
             target_dict: Dict
     ) -> "Recipe":
+        # materials with a zero amount (e.g. a precursor that is not consumed) are left out
+        balanced_reaction = {
+            side: {formula: amount for formula, amount in materials.items() if float(amount) != 0}
+            for side, materials in balanced_reaction.items()
+        }
         target = Material(
             formula=target_dict["material_formula"],
             mol=balanced_reaction["right"][target_dict["material_formula"]],
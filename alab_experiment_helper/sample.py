@@ -1,14 +1,19 @@
-from typing import List, Dict
+from typing import Dict, Tuple
 
 
 class Sample:
+    """
+    A handle to a sample in an experiment. The task ids of the sample are stored
+    in the experiment under the sample name, so that they can be shared between
+    forks of it.
+    """
+
     def __init__(self, name: str, experiment):
         self.name = name
-        self._tasks: List[str] = []
         self.experiment = experiment
 
     def add_task(self, task_id: str):
-        self._tasks.append(task_id)
+        self.experiment.add_sample_task(self.name, task_id)
 
     def to_dict(self) -> Dict[str, str]:
         return {
@@ -16,5 +21,5 @@ class Sample:
         }
 
     @property
-    def tasks(self):
-        return self._tasks
+    def tasks(self) -> Tuple[str, ...]:
+        return self.experiment.sample_tasks(self.name)
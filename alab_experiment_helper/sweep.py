@@ -0,0 +1,152 @@
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Literal, Optional, Sequence, Union
+
+from .experiment import Experiment
+
+FILE_EXTENSIONS = {
+    "json": "json",
+    "yaml": "yaml",
+    "columnar": "alab",
+}
+
+
+class ParameterSweep:
+    """
+    A sweep over the cartesian product of some parameter axes, e.g.
+
+    .. code-block:: python
+
+        def build(experiment, point, index):
+            sample = experiment.add_sample(f"sample_{index}")
+            recipe = generate_recipe(point["target"], point["precursors"], target_mass_g=2)
+            ...
+
+        sweep = ParameterSweep(
+            {"temperature": [800, 900], "time": [60, 600], "atmosphere": ["Ar", "O2"], ...},
+            build,
+            capacity=16,
+        )
+        for path in sweep.write("inputs", processes=4):
+            ...
+
+    The points are generated lazily and split into experiments of ``capacity``
+    points each, so that the sweep never has to be held in memory at once. The
+    recipes returned by ``generate_recipe`` are cached, so points that share a
+    target and precursors only balance the reaction once (per process).
+
+    Args:
+        axes: the values of each parameter
+        build: the function that adds the tasks of one point, called as
+          ``build(experiment, point, index)`` with the point as a dict of parameter
+          values and its index in the sweep. For the process-pool mode, it must be
+          picklable, e.g. a module-level function.
+        capacity: the number of points in each experiment
+        name: the prefix of the experiment names
+    """
+
+    def __init__(
+        self,
+        axes: Dict[str, Sequence[Any]],
+        build: Callable[[Experiment, Dict[str, Any], int], None],
+        capacity: int,
+        name: str = "sweep",
+    ):
+        if capacity < 1:
+            raise ValueError("The capacity should be >= 1")
+        self.axes = {key: list(values) for key, values in axes.items()}
+        self.build = build
+        self.capacity = capacity
+        self.name = name
+
+    def __len__(self) -> int:
+        return math.prod(len(values) for values in self.axes.values())
+
+    @property
+    def num_chunks(self) -> int:
+        return -(-len(self) // self.capacity)
+
+    def point(self, index: int) -> Dict[str, Any]:
+        """
+        Get the point with the given index, with the last axis varying fastest.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Point index {index} out of range")
+        point = {}
+        for key, values in reversed(self.axes.items()):
+            index, i = divmod(index, len(values))
+            point[key] = values[i]
+        return {key: point[key] for key in self.axes}
+
+    def points(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.point(index)
+
+    def experiment(self, chunk: int) -> Experiment:
+        """
+        Build the experiment of the given chunk of points.
+        """
+        if not 0 <= chunk < self.num_chunks:
+            raise IndexError(f"Chunk index {chunk} out of range")
+        experiment = Experiment(f"{self.name}_{chunk}")
+        start = chunk * self.capacity
+        for index in range(start, min(start + self.capacity, len(self))):
+            self.build(experiment, self.point(index), index)
+        return experiment
+
+    def experiments(self) -> Iterator[Experiment]:
+        for chunk in range(self.num_chunks):
+            yield self.experiment(chunk)
+
+    def write_chunk(
+        self,
+        chunk: int,
+        directory: Union[str, Path],
+        fmt: Literal["json", "yaml", "columnar"] = "json",
+    ) -> Path:
+        path = Path(directory) / f"{self.name}_{chunk:05d}.{FILE_EXTENSIONS[fmt]}"
+        self.experiment(chunk).generate_input_file(path.as_posix(), fmt=fmt)
+        return path
+
+    def write(
+        self,
+        directory: Union[str, Path],
+        fmt: Literal["json", "yaml", "columnar"] = "json",
+        processes: Optional[int] = None,
+    ) -> Iterator[Path]:
+        """
+        Write one input file per chunk into ``directory``. The arguments are checked
+        right away, and the returned iterator writes the files and yields their paths
+        in order.
+
+        Args:
+            directory: the output directory, which is created if needed
+            fmt: the format of the input files
+            processes: generate and write the chunks in a pool of this many processes.
+              By default, everything runs in the current process.
+        """
+        if fmt not in FILE_EXTENSIONS:
+            raise ValueError(f"The format should be one of {list(FILE_EXTENSIONS)}")
+        if processes is not None and processes < 1:
+            raise ValueError("The number of processes should be >= 1")
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        if processes is None:
+            return (self.write_chunk(chunk, directory, fmt) for chunk in range(self.num_chunks))
+        return self._write_parallel(directory, fmt, processes)
+
+    def _write_parallel(self, directory: Union[str, Path], fmt: str, processes: int) -> Iterator[Path]:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # only keep a few chunks in flight so that the sweep is still streamed
+            pending = deque()
+            chunks = iter(range(self.num_chunks))
+            for chunk in chunks:
+                pending.append(executor.submit(self.write_chunk, chunk, directory, fmt))
+                if len(pending) >= 2 * processes:
+                    break
+            for chunk in chunks:
+                yield pending.popleft().result()
+                pending.append(executor.submit(self.write_chunk, chunk, directory, fmt))
+            while pending:
+                yield pending.popleft().result()
@@ -25,6 +25,7 @@ def task(name):  # -> Callable[[Any], Any]:
                 single_sample = True
 
             experiment = samples[0].experiment
+            experiment.check_task_samples(samples)
             task_id = str(uuid.uuid4())
             experiment.add_task(
                 task_id=task_id,
@@ -37,6 +38,7 @@ def task(name):  # -> Callable[[Any], Any]:
                 sample.add_task(task_id=task_id)
             return samples if not single_sample else samples[0]
 
+        wrapper.task_name = name
         return wrapper
 
     return _task
@@ -15,12 +15,12 @@ def heating_with_atmosphere(
 ):
     """
     Annealing in the tube furnaces. You can select the atmosphere for heating. Four samples at a time for heating.
-    The parameter setpoints is a list of [duration, temperature] pairs. The temperature is in °C and the duration
+    The parameter setpoints is a list of [temperature, duration] pairs. The temperature is in °C and the duration
     is in minutes. The range of flow_rate should be between 0 and 1000.
 
     Args:
         samples: the samples to heat
-        setpoints: list of [duration (minutes), temperature (celsius)], e.g., [[60, 300], [7200, 300]] means to heat up to 300°C in 60 min
+        setpoints: list of [temperature (celsius), duration (minutes)], e.g., [[300, 60], [300, 720]] means to heat up to 300°C in 60 min
           in and keep it at 300°C for 12 h.
         atmosphere: the gas atmosphere for the operation. You can choose between ``Ar``, ``O2`` and ``2H_98Ar``.
         flow_rate: the flow rate of the gas in the furnace.
@@ -0,0 +1,196 @@
+import copy
+import inspect
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .sample import Sample
+
+
+class Column:
+    """
+    Refer to a column of the per-sample parameter table in a template step, e.g.
+    ``Column("temperature")``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"Column({self.name!r})"
+
+
+class TemplateStep:
+    def __init__(self, task_func: Callable[..., Any], params: Dict[str, Any], batch_size: int = 1):
+        if not hasattr(task_func, "task_name"):
+            raise TypeError(f"{task_func} is not a task, use a function decorated with @task")
+        self.task_name: str = task_func.task_name
+        self.build_parameters = task_func.__wrapped__
+        self.params = params
+        first_param = next(iter(inspect.signature(self.build_parameters).parameters.values()))
+        self.single_sample = first_param.annotation is Sample
+        if batch_size < 1:
+            raise ValueError("The batch size should be >= 1")
+        if batch_size > 1 and self.single_sample:
+            raise ValueError(f"The task {self.task_name} takes a single sample and cannot be batched")
+        self.batch_size = batch_size
+
+    def resolve(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        params = {}
+        for key, value in self.params.items():
+            if isinstance(value, Column):
+                value = row[value.name]
+            elif callable(value):
+                value = value(row)
+            params[key] = value
+        return params
+
+
+class WorkflowTemplate:
+    """
+    A chain of tasks that is applied to every sample in the same way, e.g.
+
+    .. code-block:: python
+
+        template = (
+            WorkflowTemplate("standard")
+            .add_step(starting, start_position="pos")
+            .add_step(dispensing, batch_size=16, input_file_path="recipes.csv")
+            .add_step(alab_heating, batch_size=4, heating_time_minutes=600, heating_temperature_celsius=Column("T"))
+            .add_step(diffraction, schema=lambda row: "slow_30min" if row["T"] > 1000 else "fast_10min")
+        )
+        experiment.add_samples_from_template(template, ["a", "b"], {"T": [800, 1100]})
+
+    A step parameter is either a constant, a :class:`Column` of the per-sample
+    parameter table, or a function that takes the row of the sample (including
+    its ``name``) and returns the value.
+
+    By default, every step is a task of its own for each sample. With ``batch_size``,
+    consecutive samples are grouped into one multi-sample task, e.g. the samples
+    that are heated together in a furnace. All the samples of a batch must resolve
+    to the same parameters.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps: List[TemplateStep] = []
+
+    def add_step(self, task_func: Callable[..., Any], batch_size: int = 1, **params: Any) -> "WorkflowTemplate":
+        self.steps.append(TemplateStep(task_func, params, batch_size=batch_size))
+        return self
+
+
+class TemplateInstance:
+    """
+    A template applied to a list of samples. Only the steps of the template, the
+    sample names and the per-sample parameter table are stored, the tasks are
+    expanded on export. Every task is expanded once when the instance is created
+    (without keeping the result), so that invalid parameters are reported right away.
+    Steps added to the template afterwards do not change the instance.
+
+    The ``key`` identifies the instance in the task ids, which are
+    ``"<key>/<row>/<step>"`` with the first row of the batch. The parameters of
+    single tasks can be overridden with :meth:`with_override`, e.g. in a fork of
+    the experiment.
+    """
+
+    def __init__(
+        self,
+        template: WorkflowTemplate,
+        sample_names: Sequence[str],
+        parameters: Optional[Dict[str, Sequence[Any]]] = None,
+        experiment=None,
+        key: Optional[str] = None,
+    ):
+        if parameters is None:
+            parameters = {}
+        if len(set(sample_names)) != len(sample_names):
+            raise ValueError("The sample names of a template instance should be unique")
+        for column, values in parameters.items():
+            if len(values) != len(sample_names):
+                raise ValueError(
+                    f"The parameter column {column} has {len(values)} values "
+                    f"but there are {len(sample_names)} samples"
+                )
+        self.template = template
+        self.steps: Tuple[TemplateStep, ...] = tuple(template.steps)
+        self.sample_names = list(sample_names)
+        self.parameters = {column: list(values) for column, values in parameters.items()}
+        self.experiment = experiment
+        self.key = template.name if key is None else key
+        # parameters that replace the ones built by the template, by (first row of the batch, step)
+        self.overrides: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+        for step in range(len(self.steps)):
+            for i in range(0, len(self.sample_names), self.steps[step].batch_size):
+                self.task(i, step)
+
+    def __len__(self) -> int:
+        return len(self.sample_names)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        row = {column: values[i] for column, values in self.parameters.items()}
+        row["name"] = self.sample_names[i]
+        return row
+
+    def batch(self, i: int, step: int) -> range:
+        """
+        The rows of the samples that share the task of the i-th sample in a step.
+        """
+        batch_size = self.steps[step].batch_size
+        start = i - i % batch_size
+        return range(start, min(start + batch_size, len(self.sample_names)))
+
+    def task_id(self, i: int, step: int) -> str:
+        return f"{self.key}/{self.batch(i, step).start}/{step}"
+
+    def sample_task_ids(self, i: int) -> Tuple[str, ...]:
+        return tuple(self.task_id(i, step) for step in range(len(self.steps)))
+
+    def task(self, i: int, step: int) -> Dict[str, Any]:
+        """
+        Expand the task of the i-th sample in a step, in the same layout as ``Experiment.tasks``.
+        """
+        template_step = self.steps[step]
+        rows = self.batch(i, step)
+        params = template_step.resolve(self.row(rows.start))
+        for j in rows[1:]:
+            if template_step.resolve(self.row(j)) != params:
+                raise ValueError(
+                    f"The samples {self.sample_names[rows.start]} and {self.sample_names[j]} are in the "
+                    f"same batch of step {step} ({template_step.task_name}) but have different parameters"
+                )
+        samples = [Sample(self.sample_names[j], experiment=self.experiment) for j in rows]
+        task_params = template_step.build_parameters(
+            samples[0] if template_step.single_sample else samples, **params
+        )
+        if (rows.start, step) in self.overrides:
+            task_params = {**task_params, **self.overrides[rows.start, step]}
+        return {
+            "type": template_step.task_name,
+            "parameters": task_params,
+            "samples": [sample.name for sample in samples],
+        }
+
+    def sample_tasks(self, i: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Expand the chain of the i-th sample into a list of ``(task type, parameters)``.
+        """
+        tasks = []
+        for step in range(len(self.steps)):
+            task = self.task(i, step)
+            tasks.append((task["type"], task["parameters"]))
+        return tasks
+
+    def with_override(self, i: int, step: int, task_params: Dict[str, Any]) -> "TemplateInstance":
+        """
+        Get a copy of the instance in which some parameters of one task are replaced.
+        The steps, sample names and parameter table are shared with the copy.
+        """
+        start = self.batch(i, step).start
+        instance = copy.copy(self)
+        instance.overrides = dict(self.overrides)
+        instance.overrides[start, step] = {**self.overrides.get((start, step), {}), **task_params}
+        return instance
+
+    def __iter__(self) -> Iterator[Tuple[str, List[Tuple[str, Dict[str, Any]]]]]:
+        for i, name in enumerate(self.sample_names):
+            yield name, self.sample_tasks(i)
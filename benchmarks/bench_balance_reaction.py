@@ -0,0 +1,45 @@
+"""
+Compare the linear-algebra balancing backend with ``reaction_completer.balance_recipe``
+on the corpus of real targets in ``alab_experiment_helper.reactions.corpus``.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_balance_reaction.py [repeats]
+"""
+import sys
+import time
+
+from reaction_completer import balance_recipe
+
+from alab_experiment_helper.reactions.balance_reaction import parse_material_string
+from alab_experiment_helper.reactions.corpus import CORPUS
+from alab_experiment_helper.reactions.linear_balance import balance_linear
+
+
+def main(repeats: int = 20):
+    parsed = [
+        (parse_material_string(target), [parse_material_string(precursor) for precursor in precursors])
+        for target, precursors in CORPUS
+    ]
+    print(f"{'target':<40}{'linear (ms)':>14}{'balance_recipe (ms)':>22}{'solved':>8}")
+    total_linear = total_reference = 0
+    for target, precursors in parsed:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            reaction = balance_linear(precursors, target)
+        linear_time = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            balance_recipe(precursors, [target])
+        reference_time = (time.perf_counter() - start) / repeats * 1000
+
+        total_linear += linear_time
+        total_reference += reference_time
+        print(
+            f"{target['material_formula']:<40}{linear_time:>14.3f}{reference_time:>22.3f}"
+            f"{'yes' if reaction is not None else 'no':>8}"
+        )
+    print(f"{'total':<40}{total_linear:>14.3f}{total_reference:>22.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
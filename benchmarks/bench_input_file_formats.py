@@ -0,0 +1,83 @@
+"""
+Compare the size and load time of the json, yaml and columnar input files.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_input_file_formats.py [num_samples]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.columnar import dump_columnar, load_columnar
+from alab_experiment_helper.tasks import *
+
+
+def build_experiment(num_samples: int) -> Experiment:
+    experiment = Experiment("benchmark")
+    samples = [experiment.add_sample(f"sample_{i}") for i in range(num_samples)]
+    for sample in samples:
+        starting(sample, start_position="pos")
+    for i in range(0, num_samples, 16):
+        dispensing(samples[i:i + 16], input_file_path="example.csv")
+    for i in range(0, num_samples, 4):
+        simple_heating_with_atmosphere(
+            samples[i:i + 4],
+            heating_time_minutes=600,
+            heating_temperature_celsius=800 + i % 100,
+            atmosphere="Ar",
+        )
+    for sample in samples:
+        recover_powder(sample)
+        diffraction(sample, schema="fast_10min")
+        ending(sample, end_position="pos")
+    return experiment
+
+
+def timeit(f):
+    start = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - start
+
+
+def main(num_samples: int = 20000):
+    experiment = build_experiment(num_samples)
+    experiment_dict = experiment.to_dict()
+    print(f"{num_samples} samples, {len(experiment_dict['tasks'])} tasks")
+    print(f"{'format':<20}{'size (kB)':>12}{'write (s)':>12}{'open (s)':>12}{'to_dict (s)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+
+        def report(label, path, write_time, open_time, load_time):
+            size = path.stat().st_size / 1024
+            print(f"{label:<20}{size:>12.1f}{write_time:>12.3f}{open_time:>12.4f}{load_time:>14.3f}")
+
+        path = tmpdir / "input.json"
+        _, write_time = timeit(lambda: path.write_text(json.dumps(experiment_dict, indent=2)))
+        _, load_time = timeit(lambda: json.loads(path.read_text()))
+        report("json", path, write_time, load_time, load_time)
+
+        if num_samples <= 5000:
+            path = tmpdir / "input.yaml"
+            _, write_time = timeit(
+                lambda: path.write_text(yaml.dump(experiment_dict, default_flow_style=False, indent=2))
+            )
+            loader = getattr(yaml, "CLoader", yaml.Loader)
+            _, load_time = timeit(lambda: yaml.load(path.read_text(), Loader=loader))
+            report("yaml", path, write_time, load_time, load_time)
+
+        for compression in (None, "zlib", "lzma"):
+            path = tmpdir / f"input_{compression}.alab"
+            _, write_time = timeit(lambda: dump_columnar(experiment_dict, path, compression=compression))
+            reader, open_time = timeit(lambda: load_columnar(path))
+            _, load_time = timeit(reader.to_dict)
+            reader.close()
+            report(f"columnar ({compression})", path, write_time, open_time, load_time)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,20 @@
+import pytest
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.tasks import *
+
+
+@pytest.fixture
+def experiment():
+    experiment = Experiment("test")
+    samples = [experiment.add_sample(name="sample_" + str(i)) for i in range(8)]
+    for sample in samples:
+        starting(sample, start_position="pos")
+    dispensing(samples, input_file_path="example.csv")
+    alab_heating(samples[:4], heating_time_minutes=120, heating_temperature_celsius=600.5)
+    heating_with_atmosphere(samples[4:], [[300, 60], [300, 600]], atmosphere="Ar")
+    for i, sample in enumerate(samples):
+        recover_powder(sample)
+        diffraction(sample, schema="slow_30min" if i == 0 else "fast_10min")
+        ending(sample, end_position="pos")
+    return experiment
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.columnar import MAGIC, VERSION, ColumnarFormatError, dump_columnar, load_columnar
+
+
+def _normalize(experiment_dict):
+    experiment_dict = json.loads(json.dumps(experiment_dict))
+    for task in experiment_dict["tasks"]:
+        task["prev_tasks"] = sorted(task["prev_tasks"])
+    return experiment_dict
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_round_trip(experiment: Experiment, tmp_path, compression, use_mmap):
+    path = tmp_path / "test.alab"
+    dump_columnar(experiment.to_dict(), path, compression=compression)
+    with load_columnar(path, use_mmap=use_mmap) as reader:
+        assert reader.num_tasks == len(experiment.tasks)
+        assert reader.num_samples == 8
+        assert _normalize(reader.to_dict()) == _normalize(experiment.to_dict())
+
+
+def test_missing_and_mixed_parameters(tmp_path):
+    experiment_dict = {
+        "name": "mixed",
+        "samples": [{"name": "a"}, {"name": "b"}],
+        "tasks": [
+            {"type": "T", "parameters": {"x": 1, "flag": True}, "samples": ["a"], "prev_tasks": []},
+            {"type": "T", "parameters": {"x": 1.5, "flag": False, "y": None}, "samples": ["b"], "prev_tasks": [0]},
+        ],
+    }
+    path = tmp_path / "mixed.alab"
+    dump_columnar(experiment_dict, path)
+    with load_columnar(path) as reader:
+        assert reader.task(0)["parameters"] == {"x": 1, "flag": True}
+        assert type(reader.task(0)["parameters"]["x"]) is int
+        assert reader.task(1) == experiment_dict["tasks"][1]
+
+
+def test_task_graph_from_file(experiment: Experiment, tmp_path):
+    path = tmp_path / "test.alab"
+    experiment.generate_input_file(path.as_posix(), fmt="columnar", compression="zlib")
+    with load_columnar(path) as reader:
+        assert reader.compression == "zlib"
+        graph = reader.to_task_graph()
+        assert graph.critical_path()[0] == experiment.to_task_graph().critical_path()[0]
+
+
+def test_not_columnar(tmp_path):
+    path = tmp_path / "test.json"
+    path.write_text("{}")
+    with pytest.raises(ColumnarFormatError):
+        load_columnar(path)
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_invalid_header(experiment: Experiment, tmp_path, use_mmap):
+    path = tmp_path / "test.alab"
+    path.write_bytes(MAGIC)
+    with pytest.raises(ColumnarFormatError):
+        load_columnar(path, use_mmap=use_mmap)
+
+    dump_columnar(experiment.to_dict(), path)
+    data = path.read_bytes()
+    path.write_bytes(data.replace(b'"version": %d' % VERSION, b'"version": %d' % (VERSION + 1), 1))
+    with pytest.raises(ColumnarFormatError, match="version"):
+        load_columnar(path, use_mmap=use_mmap)
@@ -0,0 +1,90 @@
+import pytest
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.sample import Sample
+from alab_experiment_helper.template import Column, WorkflowTemplate
+from alab_experiment_helper.tasks import *
+
+
+def test_fork_shares_until_modified(experiment: Experiment):
+    base_dict = experiment.to_dict()
+    fork = experiment.fork("variant")
+    assert fork.name == "variant"
+    assert fork.tasks is experiment.tasks
+    assert fork.to_dict()["tasks"] == base_dict["tasks"]
+
+    [task_id] = fork.find_tasks(task_type="HeatingWithAtmosphere")
+    fork.update_task(task_id, atmosphere="O2")
+
+    assert fork.tasks is not experiment.tasks
+    assert fork.tasks[task_id]["parameters"]["atmosphere"] == "O2"
+    assert experiment.tasks[task_id]["parameters"]["atmosphere"] == "Ar"
+    assert experiment.to_dict() == base_dict
+    # unchanged tasks are still shared
+    [diffraction_id] = fork.find_tasks(task_type="Diffraction", sample_name="sample_0")
+    assert fork.tasks[diffraction_id] is experiment.tasks[diffraction_id]
+
+
+def test_fork_isolated_from_later_changes(experiment: Experiment):
+    sample = experiment.sample("sample_0")
+    fork = experiment.fork()
+
+    recover_powder(sample)
+    new_sample = fork.add_sample("sample_8")
+    starting(new_sample, start_position="pos")
+    diffraction(fork.sample("sample_1"), schema="slow_30min")
+
+    assert len(experiment.sample("sample_0").tasks) == 7
+    assert len(fork.sample("sample_0").tasks) == 6
+    assert len(experiment.sample("sample_1").tasks) == 6
+    assert len(fork.sample("sample_1").tasks) == 7
+    assert len(experiment.samples) == 8
+    assert len(fork.samples) == 9
+    with pytest.raises(KeyError):
+        experiment.sample("sample_8")
+
+    second_fork = fork.fork()
+    assert second_fork.to_dict()["tasks"] == fork.to_dict()["tasks"]
+
+
+def test_sample_handle_by_name(experiment: Experiment):
+    sample = Sample("sample_0", experiment)
+    assert sample.tasks == experiment.sample("sample_0").tasks
+    assert isinstance(sample.tasks, tuple)
+    recover_powder(sample)
+    assert len(experiment.sample("sample_0").tasks) == 7
+    with pytest.raises(KeyError):
+        Sample("missing", experiment).tasks
+
+
+def test_fork_templated_experiment():
+    template = (
+        WorkflowTemplate("standard")
+        .add_step(starting, start_position="pos")
+        .add_step(
+            simple_heating_with_atmosphere,
+            heating_time_minutes=60,
+            heating_temperature_celsius=Column("temperature"),
+            atmosphere="Ar",
+        )
+        .add_step(ending, end_position="pos")
+    )
+    experiment = Experiment("base")
+    experiment.add_samples_from_template(template, ["a", "b"], {"temperature": [800, 900]})
+    base_dict = experiment.to_dict()
+
+    fork = experiment.fork()
+    assert len(fork.find_tasks("Starting")) == 2
+    [task_id] = fork.find_tasks("HeatingWithAtmosphere", sample_name="b")
+    fork.update_task(task_id, atmosphere="O2")
+    fork.update_task(task_id, flow_rate=50)
+
+    assert experiment.to_dict() == base_dict
+    fork_dict = fork.to_dict()
+    heating = [task["parameters"] for task in fork_dict["tasks"] if task["type"] == "HeatingWithAtmosphere"]
+    assert [(p["atmosphere"], p["flow_rate"]) for p in heating] == [("Ar", 100), ("O2", 50)]
+    assert fork.template_instances[0].parameters is experiment.template_instances[0].parameters
+
+    second_fork = fork.fork()
+    second_fork.update_task(task_id, atmosphere="2H_98Ar")
+    assert fork.to_dict() == fork_dict
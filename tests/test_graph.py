@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.graph import CycleError, TaskGraph, estimate_task_duration
+from alab_experiment_helper.tasks import heating_with_atmosphere, simple_heating_with_atmosphere
+
+
+def test_csr_matches_to_dict(experiment: Experiment):
+    graph = experiment.to_task_graph()
+    tasks = experiment.to_dict()["tasks"]
+    assert graph.num_tasks == len(tasks)
+    assert graph.task_types == [task["type"] for task in tasks]
+    for i, task in enumerate(tasks):
+        assert sorted(graph.prev_tasks(i).tolist()) == sorted(task["prev_tasks"])
+
+
+def test_levels_and_topological_order(experiment: Experiment):
+    graph = experiment.to_task_graph()
+    assert not graph.has_cycle()
+    assert graph.levels.max() == 5
+    position = np.empty(graph.num_tasks, dtype=np.int64)
+    position[graph.topological_order()] = np.arange(graph.num_tasks)
+    for i in range(graph.num_tasks):
+        assert (position[graph.prev_tasks(i)] < position[i]).all()
+
+
+def test_critical_path(experiment: Experiment):
+    graph = experiment.to_task_graph()
+    length, path = graph.critical_path()
+    assert length == pytest.approx(660 + 2 + 10)
+    assert [graph.task_types[i] for i in path] == [
+        "Starting", "Dispensing", "HeatingWithAtmosphere", "RecoverPowder", "Diffraction", "Ending"
+    ]
+    assert estimate_task_duration("Diffraction", {"schema": "slow_30min"}) == 30
+
+
+def test_heating_with_atmosphere_duration():
+    sample = Experiment("heating").add_sample("sample")
+    heating_with_atmosphere([sample], setpoints=[[300, 60], [300, 720]], atmosphere="Ar")
+    simple_heating_with_atmosphere(
+        [sample], heating_time_minutes=720, heating_temperature_celsius=300, atmosphere="Ar", ramp_rate_celsius_per_min=5
+    )
+    first, second = (sample.experiment.tasks[task_id] for task_id in sample.tasks)
+    assert estimate_task_duration("HeatingWithAtmosphere", first["parameters"]) == 780
+    assert estimate_task_duration("HeatingWithAtmosphere", second["parameters"]) == 780
+
+
+def test_cycle_detection():
+    graph = TaskGraph.from_edges(["a", "b", "c", "d"], ["Starting"] * 4, [0, 1, 2, 2], [1, 2, 1, 3])
+    assert graph.has_cycle()
+    assert graph.cycle_tasks().tolist() == [1, 2, 3]
+    with pytest.raises(CycleError):
+        graph.topological_order()
@@ -0,0 +1,100 @@
+import pytest
+
+from alab_experiment_helper.reactions.corpus import CORPUS
+from alab_experiment_helper.reactions.linear_balance import balance_linear, material_composition
+from alab_experiment_helper.reactions.recipe import Recipe
+
+
+def _material(formula, elements, molmass=100.0):
+    return {
+        "material_formula": formula,
+        "composition": [{"formula": formula, "elements": elements, "amount": "1.0"}],
+        "molmass": molmass,
+    }
+
+
+def test_carbonate_releases_co2():
+    precursors = [_material("Li2CO3", {"Li": "2", "C": "1", "O": "3"}), _material("Fe2O3", {"Fe": "2", "O": "3"})]
+    target = _material("LiFeO2", {"Li": "1", "Fe": "1", "O": "2"})
+    assert balance_linear(precursors, target) == {
+        "left": {"Li2CO3": 0.5, "Fe2O3": 0.5},
+        "right": {"LiFeO2": 1.0, "CO2": 0.5},
+    }
+
+
+def test_phosphate_with_oxygen_release():
+    precursors = [
+        _material("Li2CO3", {"Li": "2", "C": "1", "O": "3"}),
+        _material("Fe2O3", {"Fe": "2", "O": "3"}),
+        _material("NH4H2PO4", {"N": "1", "H": "6", "P": "1", "O": "4"}),
+    ]
+    target = _material("LiFePO4", {"Li": "1", "Fe": "1", "P": "1", "O": "4"})
+    reaction = balance_linear(precursors, target)
+    assert reaction["left"] == {"Li2CO3": 0.5, "Fe2O3": 0.5, "NH4H2PO4": 1.0}
+    assert reaction["right"] == {"LiFePO4": 1.0, "CO2": 0.5, "H2O": 1.5, "NH3": 1.0, "O2": 0.25}
+
+    recipe = Recipe.build_recipe(reaction, precursors, target)
+    assert [precursor.mol for precursor in recipe.precursors] == [0.5, 0.5, 1.0]
+    assert recipe.target.mol == 1.0
+
+
+def test_fractional_composition_is_exact():
+    precursors = [_material("Li2O", {"Li": "2", "O": "1"}), _material("Co3O4", {"Co": "3", "O": "4"})]
+    target = _material("LiCo0.7O1.9", {"Li": "1", "Co": "0.7", "O": "1.9"})
+    reaction = balance_linear(precursors, target)
+    assert reaction["left"]["Co3O4"] == pytest.approx(0.7 / 3)
+    assert material_composition(target)["Co"] * 10 == 7
+
+
+@pytest.mark.parametrize(
+    "precursors",
+    [
+        # open variable in the composition
+        [_material("LixCoO2", {"Li": "x", "Co": "1", "O": "2"})],
+        # two precursors for the same element: no unique solution
+        [_material("CoO", {"Co": "1", "O": "1"}), _material("Co3O4", {"Co": "3", "O": "4"})],
+        # the target cannot be made from the precursors
+        [_material("NiO", {"Ni": "1", "O": "1"})],
+    ],
+)
+def test_falls_back(precursors):
+    target = _material("CoO2", {"Co": "1", "O": "2"})
+    assert balance_linear(precursors, target) is None
+
+
+def test_unused_precursor_is_left_out():
+    precursors = [
+        _material("Li2CO3", {"Li": "2", "C": "1", "O": "3"}),
+        _material("SiO2", {"Si": "1", "O": "2"}),
+        _material("Fe2O3", {"Fe": "2", "O": "3"}),
+    ]
+    target = _material("LiFeO2", {"Li": "1", "Fe": "1", "O": "2"})
+    assert balance_linear(precursors, target)["left"] == {"Li2CO3": 0.5, "Fe2O3": 0.5}
+
+    # the same rule applies to the reactions of reaction_completer
+    reaction = {"left": {"Li2CO3": 0.5, "SiO2": 0.0, "Fe2O3": 0.5}, "right": {"LiFeO2": 1.0, "CO2": 0.5}}
+    recipe = Recipe.build_recipe(reaction, precursors, target)
+    assert [precursor.formula for precursor in recipe.precursors] == ["Li2CO3", "Fe2O3"]
+    assert recipe.balanced_reaction["left"] == {"Li2CO3": 0.5, "Fe2O3": 0.5}
+
+
+def _normalized(recipe: Recipe) -> dict:
+    return {
+        "target": (recipe.target.formula, round(recipe.target.mol, 6)),
+        "precursors": [(precursor.formula, round(precursor.mol, 6)) for precursor in recipe.precursors],
+        "balanced_reaction": {
+            side: {formula: round(float(amount), 6) for formula, amount in sorted(materials.items())}
+            for side, materials in sorted(recipe.balanced_reaction.items())
+        },
+    }
+
+
+@pytest.mark.parametrize("target, precursors", CORPUS)
+def test_cross_check_reaction_completer(target, precursors):
+    pytest.importorskip("material_parser")
+    pytest.importorskip("reaction_completer")
+    from alab_experiment_helper.reactions.balance_reaction import generate_recipe
+
+    linear = generate_recipe(target, precursors, target_mass_g=2, backend="linear")
+    reference = generate_recipe(target, precursors, target_mass_g=2, backend="reaction_completer")
+    assert _normalized(linear) == _normalized(reference)
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from alab_experiment_helper.sweep import ParameterSweep
+from alab_experiment_helper.tasks import *
+
+AXES = {
+    "temperature": [800, 900, 1000],
+    "time": [60, 600],
+    "atmosphere": ["Ar", "O2"],
+}
+
+
+def build(experiment, point, index):
+    sample = experiment.add_sample(f"sample_{index}")
+    starting(sample, start_position="pos")
+    simple_heating_with_atmosphere(
+        [sample],
+        heating_time_minutes=point["time"],
+        heating_temperature_celsius=point["temperature"],
+        atmosphere=point["atmosphere"],
+    )
+    ending(sample, end_position="pos")
+
+
+@pytest.fixture
+def sweep():
+    return ParameterSweep(AXES, build, capacity=5)
+
+
+def test_points(sweep: ParameterSweep):
+    assert len(sweep) == 12
+    assert sweep.num_chunks == 3
+    points = list(sweep.points())
+    assert points[0] == {"temperature": 800, "time": 60, "atmosphere": "Ar"}
+    assert points[1] == {"temperature": 800, "time": 60, "atmosphere": "O2"}
+    assert points[-1] == {"temperature": 1000, "time": 600, "atmosphere": "O2"}
+    assert len({tuple(point.values()) for point in points}) == 12
+
+
+def test_experiments(sweep: ParameterSweep):
+    experiments = list(sweep.experiments())
+    assert [len(experiment.samples) for experiment in experiments] == [5, 5, 2]
+    assert experiments[2].samples[-1].name == "sample_11"
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_write(sweep: ParameterSweep, tmp_path, processes):
+    paths = list(sweep.write(tmp_path / "inputs", processes=processes))
+    assert [path.name for path in paths] == ["sweep_00000.json", "sweep_00001.json", "sweep_00002.json"]
+    assert json.loads(paths[1].read_text()) == json.loads(json.dumps(sweep.experiment(1).to_dict()))
+
+
+def test_write_checks_arguments_eagerly(sweep: ParameterSweep, tmp_path):
+    with pytest.raises(ValueError):
+        sweep.write(tmp_path, fmt="xml")
+    with pytest.raises(ValueError):
+        sweep.write(tmp_path, processes=0)
+
+
+def build_with_recipe(experiment, point, index):
+    from alab_experiment_helper.reactions.balance_reaction import generate_recipe
+
+    generate_recipe("LiFeO2", point["precursors"], target_mass_g=point["mass"])
+    sample = experiment.add_sample(f"sample_{index}")
+    starting(sample, start_position="pos")
+
+
+def test_recipes_reused_across_points(monkeypatch):
+    pytest.importorskip("material_parser")
+    pytest.importorskip("reaction_completer")
+    from alab_experiment_helper.reactions import balance_reaction as module
+
+    calls = []
+    balance_recipe = module.balance_recipe
+
+    def counting_balance_recipe(*args, **kwargs):
+        calls.append(args)
+        return balance_recipe(*args, **kwargs)
+
+    monkeypatch.setattr(module, "balance_recipe", counting_balance_recipe)
+    module.balance_reaction.cache_clear()
+
+    sweep = ParameterSweep(
+        {"precursors": [["Li2CO3", "Fe2O3"], ["Fe2O3", "Li2CO3"]], "mass": [1, 2, 3]},
+        build_with_recipe,
+        capacity=4,
+    )
+    assert len(list(sweep.experiments())) == 2
+    assert len(calls) == 1
+    assert module.balance_reaction.cache_info().hits == 5
+
+    # the precursors keep the order given by the caller
+    first = module.generate_recipe("LiFeO2", ["Li2CO3", "Fe2O3"], target_mol=1)
+    second = module.generate_recipe("LiFeO2", ["Fe2O3", "Li2CO3"], target_mol=1)
+    assert [p.formula for p in first.precursors] == ["Li2CO3", "Fe2O3"]
+    assert [p.formula for p in second.precursors] == ["Fe2O3", "Li2CO3"]
+    assert first.balanced_reaction is not second.balanced_reaction
+    assert list(first.balanced_reaction["left"]) == ["Li2CO3", "Fe2O3"]
+    assert list(second.balanced_reaction["left"]) == ["Fe2O3", "Li2CO3"]
@@ -0,0 +1,187 @@
+import pytest
+
+from alab_experiment_helper import Experiment
+from alab_experiment_helper.sample import Sample
+from alab_experiment_helper.tasks import *
+from alab_experiment_helper.template import Column, WorkflowTemplate
+
+
+@pytest.fixture
+def template():
+    return (
+        WorkflowTemplate("standard")
+        .add_step(starting, start_position="pos")
+        .add_step(dispensing, input_file_path="example.csv")
+        .add_step(
+            simple_heating_with_atmosphere,
+            heating_time_minutes=Column("time"),
+            heating_temperature_celsius=Column("temperature"),
+            atmosphere="Ar",
+        )
+        .add_step(recover_powder)
+        .add_step(diffraction, schema=lambda row: "slow_30min" if row["name"] == "b" else "fast_10min")
+        .add_step(ending, end_position="pos")
+    )
+
+
+def test_template_matches_eager(template):
+    experiment = Experiment("template")
+    experiment.add_samples_from_template(
+        template, ["a", "b"], {"time": [60, 120], "temperature": [800, 900]}
+    )
+
+    eager = Experiment("template")
+    for name, time, temperature, schema in [("a", 60, 800, "fast_10min"), ("b", 120, 900, "slow_30min")]:
+        sample = eager.add_sample(name)
+        starting(sample, start_position="pos")
+        dispensing([sample], input_file_path="example.csv")
+        simple_heating_with_atmosphere(
+            [sample], heating_time_minutes=time, heating_temperature_celsius=temperature, atmosphere="Ar"
+        )
+        recover_powder(sample)
+        diffraction(sample, schema=schema)
+        ending(sample, end_position="pos")
+
+    assert experiment.tasks == {}
+    assert experiment.to_dict() == eager.to_dict()
+
+    graph = experiment.to_task_graph()
+    assert graph.num_tasks == 12
+    assert graph.critical_path()[0] == eager.to_task_graph().critical_path()[0]
+
+
+def test_template_after_regular_samples(template):
+    experiment = Experiment("mixed")
+    sample = experiment.add_sample("regular")
+    starting(sample, start_position="pos")
+    ending(sample, end_position="pos")
+    experiment.add_samples_from_template(template, ["a"], {"time": [60], "temperature": [800]})
+
+    experiment_dict = experiment.to_dict()
+    assert [sample["name"] for sample in experiment_dict["samples"]] == ["regular", "a"]
+    assert experiment_dict["tasks"][2]["prev_tasks"] == []
+    assert experiment_dict["tasks"][3]["prev_tasks"] == [2]
+
+
+def test_template_invalid_parameters(template):
+    experiment = Experiment("invalid")
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["a", "b"], {"time": [60], "temperature": [800, 900]})
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["a"], {"time": [60], "temperature": [5000]})
+
+
+def test_template_samples_are_first_class(template):
+    experiment = Experiment("first_class")
+    experiment.add_sample("regular")
+    experiment.add_samples_from_template(template, ["a", "b"], {"time": [60, 120], "temperature": [800, 900]})
+
+    assert [sample.name for sample in experiment.samples] == ["regular", "a", "b"]
+    assert len(experiment.sample("b").tasks) == 6
+    assert experiment.task(experiment.sample("a").tasks[0])["type"] == "Starting"
+    assert len(experiment.find_tasks("Starting")) == 2
+    assert len(experiment.find_tasks("Diffraction", sample_name="a")) == 1
+    with pytest.raises(ValueError):
+        starting(experiment.sample("a"), start_position="pos")
+
+
+def test_invalid_task_samples_change_nothing(template):
+    experiment = Experiment("atomic")
+    regular = experiment.add_sample("s0")
+    starting(regular, start_position="pos")
+    experiment.add_samples_from_template(template, ["a"], {"time": [60], "temperature": [800]})
+    tasks = dict(experiment.tasks)
+    sample_tasks = {sample.name: sample.tasks for sample in experiment.samples}
+
+    with pytest.raises(ValueError):
+        alab_heating([regular, experiment.sample("a")], heating_time_minutes=60, heating_temperature_celsius=800)
+    with pytest.raises(KeyError):
+        alab_heating([regular, Sample("missing", experiment)], heating_time_minutes=60, heating_temperature_celsius=800)
+
+    assert experiment.tasks == tasks
+    assert {sample.name: sample.tasks for sample in experiment.samples} == sample_tasks
+    assert len(experiment.to_dict()["tasks"]) == 7
+
+
+def test_duplicate_sample_names(template):
+    experiment = Experiment("duplicates")
+    experiment.add_samples_from_template(template, ["x"], {"time": [60], "temperature": [800]})
+    with pytest.raises(ValueError):
+        experiment.add_sample("x")
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["y", "x"], {"time": [60, 60], "temperature": [800, 800]})
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["z", "z"], {"time": [60, 60], "temperature": [800, 800]})
+    experiment.add_sample("regular")
+    with pytest.raises(ValueError):
+        experiment.add_sample("regular")
+
+
+def test_task_ids_unique_per_instance(template):
+    experiment = Experiment("unique")
+    experiment.add_samples_from_template(template, ["a"], {"time": [60], "temperature": [800]})
+    experiment.add_samples_from_template(template, ["b"], {"time": [60], "temperature": [800]})
+    task_ids = experiment.to_task_graph().task_ids
+    assert len(set(task_ids)) == len(task_ids) == 12
+
+
+def test_template_invalid_later_row(template):
+    experiment = Experiment("invalid")
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["a", "b"], {"time": [60, -5], "temperature": [800, 900]})
+    assert experiment.samples == []
+
+
+def test_batched_steps_match_eager():
+    template = (
+        WorkflowTemplate("batched")
+        .add_step(starting, start_position="pos")
+        .add_step(dispensing, batch_size=16, input_file_path="example.csv")
+        .add_step(alab_heating, batch_size=4, heating_time_minutes=120, heating_temperature_celsius=Column("T"))
+        .add_step(recover_powder)
+        .add_step(diffraction, schema="fast_10min")
+        .add_step(ending, end_position="pos")
+    )
+    names = [f"sample_{i}" for i in range(6)]
+    experiment = Experiment("batched")
+    experiment.add_samples_from_template(template, names, {"T": [800] * 4 + [900] * 2})
+
+    eager = Experiment("batched")
+    samples = [eager.add_sample(name) for name in names]
+    for sample in samples:
+        starting(sample, start_position="pos")
+    dispensing(samples, input_file_path="example.csv")
+    alab_heating(samples[:4], heating_time_minutes=120, heating_temperature_celsius=800)
+    alab_heating(samples[4:], heating_time_minutes=120, heating_temperature_celsius=900)
+    for sample in samples:
+        recover_powder(sample)
+        diffraction(sample, schema="fast_10min")
+        ending(sample, end_position="pos")
+
+    assert experiment.to_dict() == eager.to_dict()
+    assert experiment.to_task_graph().num_tasks == 6 * 4 + 1 + 2
+    assert experiment.sample("sample_5").tasks[2] == "batched#0/4/2"
+    assert len(experiment.find_tasks("Heating")) == 2
+    assert experiment.find_tasks("Heating", sample_name="sample_5") == ["batched#0/4/2"]
+
+
+def test_batch_with_different_parameters():
+    template = WorkflowTemplate("batched").add_step(
+        alab_heating, batch_size=4, heating_time_minutes=120, heating_temperature_celsius=Column("T")
+    )
+    experiment = Experiment("batched")
+    with pytest.raises(ValueError):
+        experiment.add_samples_from_template(template, ["a", "b"], {"T": [800, 900]})
+    with pytest.raises(ValueError):
+        WorkflowTemplate("single").add_step(starting, batch_size=4, start_position="pos")
+
+
+def test_instance_keeps_steps_of_template(template):
+    experiment = Experiment("snapshot")
+    experiment.add_samples_from_template(template, ["a"], {"time": [60], "temperature": [800]})
+    template.add_step(ending, end_position="other")
+
+    assert len(experiment.sample("a").tasks) == 6
+    assert len(experiment.to_dict()["tasks"]) == 6
+    with pytest.raises(KeyError):
+        experiment.task("standard#0/0/6")